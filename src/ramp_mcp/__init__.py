@@ -34,7 +34,7 @@ server = FastMCP(
     as possible.
     - Ensure that all calculations are accurate.
     """,
-    dependencies=["httpx", "iso4217", "flatten_json"],
+    dependencies=["httpx[http2]", "iso4217", "orjson"],
 )
 
 scope_to_tools_mapping = {
@@ -66,19 +66,18 @@ scope_to_tools_mapping = {
     """,
 )
 def main(scopes: str):
-    # register load tools based on scopes
-    scopes = scopes.split(",")
-    for scope in scopes:
+    # register load tools based on scopes, in the order the user gave them;
+    # the set is only for the membership and subset checks below
+    scope_list = scopes.split(",")
+    scopes = set(scope_list)
+    for scope in scope_list:
         if scope not in scope_to_tools_mapping:
             continue
         for tool in scope_to_tools_mapping[scope]:
             server.add_tool(tool)
 
     # special tool that requires all three scopes
-    if all(
-        scope in scopes
-        for scope in ["transactions:read", "reimbursements:read", "bills:read"]
-    ):
+    if {"transactions:read", "reimbursements:read", "bills:read"} <= scopes:
         server.add_tool(load_spend_export)
 
     # always register fetch tools
@@ -88,7 +87,7 @@ def main(scopes: str):
     server.add_tool(process_data)
     server.add_tool(execute_query)
 
-    ramp_client.connect(scopes)
+    ramp_client.connect(sorted(scopes))
 
     server.run(transport="stdio")
 
@@ -1,10 +1,14 @@
+import asyncio
 import base64
 import os
+from collections.abc import AsyncIterator
 from typing import Any
 
 import httpx
+import orjson
 
-from .constants import CLIENT_MAX_PAGES
+from .constants import CLIENT_MAX_PAGES, CLIENT_MAX_RETRIES
+from .types import RawPages
 
 ENV_TO_BASE_URL = {
     "demo": "https://demo-api.ramp.com/developer/v1",
@@ -19,7 +23,7 @@ def get_access_token_with_client_credentials(base_url: str, scopes: list[str]) -
     )
     if not client_id or not client_secret:
         raise ValueError("RAMP_CLIENT_ID and RAMP_CLIENT_SECRET must be set for client credentials flow")
-    
+
     headers = {
         "Accept": "application/json",
         "Authorization": f"Basic {base64.b64encode(f'{client_id}:{client_secret}'.encode()).decode()}",
@@ -30,11 +34,15 @@ def get_access_token_with_client_credentials(base_url: str, scopes: list[str]) -
         "scope": " ".join(scopes),
     }
 
-    response = httpx.post(
-        f"{base_url}/token",
-        headers=headers,
-        data=payload,
-    )
+    # short-lived sync client on purpose: connect() runs before the
+    # server's event loop exists, and any connection pooled here would
+    # be bound to the wrong loop and break the first tool call
+    with httpx.Client(http2=True) as client:
+        response = client.post(
+            f"{base_url}/token",
+            headers=headers,
+            data=payload,
+        )
     response.raise_for_status()
 
     return response.json()["access_token"]
@@ -77,14 +85,24 @@ class RampAsyncClient:
                 )
             elif auth_method == "oauth2_token":
                 self._access_token = get_access_token_from_env()
-            
+
+        # constructing the async client opens no connections, so it is
+        # safe to build here and first use it on the server's event loop
         self.client = httpx.AsyncClient(
+            # multiplex concurrent page requests over one TCP/TLS connection
+            http2=True,
+            limits=httpx.Limits(
+                max_connections=50,
+                max_keepalive_connections=20,
+                keepalive_expiry=30.0,
+            ),
+            timeout=httpx.Timeout(30.0, connect=10.0),
             headers={
                 "Accept": "application/json",
                 "Authorization": f"Bearer {self._access_token}",
                 "Content-Type": "application/json",
                 "User-Agent": "Ramp-MCP/0.0.1",
-            }
+            },
         )
 
     def __init__(self):
@@ -93,40 +111,163 @@ class RampAsyncClient:
             raise ValueError(f"Invalid Ramp environment: {env}")
         self._base_url = ENV_TO_BASE_URL[env]
         self._access_token = None
+        self._max_concurrency = int(os.getenv("RAMP_MAX_CONCURRENCY", "10"))
+        self._semaphore = asyncio.Semaphore(self._max_concurrency)
         self.client = None
 
-    async def paginate_list_endpoint(
+    @staticmethod
+    def _raise_for_status(response: httpx.Response) -> None:
+        try:
+            response.raise_for_status()
+        except httpx.HTTPStatusError as e:
+            if e.response.status_code == 401:
+                raise Exception("Authentication failed. Please check your access token or client credentials.")
+            elif e.response.status_code == 403:
+                raise Exception("Access forbidden. Please ensure your token has the required scopes for this operation.")
+            else:
+                raise
+
+    async def _get_page(
+        self,
+        url: str | httpx.URL,
+        params: dict[str, Any] | None = None,
+    ) -> httpx.Response:
+        """
+        GET a single page under the concurrency limit,
+        backing off on rate-limit responses
+        """
+        async with self._semaphore:
+            for attempt in range(CLIENT_MAX_RETRIES):
+                response = await self.client.get(url, params=params)
+                if response.status_code != 429:
+                    break
+                retry_after = float(response.headers.get("Retry-After", 2**attempt))
+                await asyncio.sleep(retry_after)
+            return response
+
+    @staticmethod
+    def _predictable_next(url: httpx.URL) -> tuple[httpx.URL, int, int] | None:
+        """
+        Detect numeric offset cursors in a `next` url.
+        Returns (url, start, page_size) when pages ahead can be precomputed,
+        None when the cursor is opaque.
+        """
+        start = url.params.get("start")
+        page_size = url.params.get("page_size")
+        if (
+            start is not None
+            and page_size is not None
+            and start.isdigit()
+            and page_size.isdigit()
+            and int(page_size) > 0
+        ):
+            return url, int(start), int(page_size)
+        return None
+
+    async def stream_pages(
         self,
         path: str,
         params: dict[str, Any],
         **kwargs: Any,
-    ) -> list[dict[str, Any]]:
+    ) -> AsyncIterator[list[dict[str, Any]]]:
         """
-        GET all pages of a list endpoint
+        GET pages of a list endpoint, yielding each page's rows
         """
-        results = []
-        _url = f"{self._base_url}{path}"
+        async for res, _ in self._stream_page_payloads(path, params, **kwargs):
+            yield res["data"]
+
+    async def _stream_page_payloads(
+        self,
+        path: str,
+        params: dict[str, Any],
+        **kwargs: Any,
+    ) -> AsyncIterator[tuple[dict[str, Any], bytes]]:
+        """
+        GET pages of a list endpoint, yielding each page parsed and as
+        its raw body bytes.
+
+        Keeps one page of lookahead in flight: the request for page N+1 is
+        issued as soon as page N is parsed, so the network wait for the next
+        page overlaps whatever the consumer does with the current rows.
+        """
+        # params only apply to the first page; the `next` url carries them after
+        pending = asyncio.create_task(
+            self._get_page(f"{self._base_url}{path}", params=params | kwargs)
+        )
         i = 1
-        while _url is not None:
-            if i > CLIENT_MAX_PAGES:
+        try:
+            while pending is not None:
+                if i > CLIENT_MAX_PAGES:
+                    raise Exception("Too many pages, try to filter more results out.")
+                response = await pending
+                pending = None
+                self._raise_for_status(response)
+
+                res = orjson.loads(response.content)
+                _url = res["page"]["next"]
+                i += 1
+                if _url is not None:
+                    # parse once into an httpx.URL so the transport skips
+                    # its params-merging/re-encoding path on every page
+                    _url = httpx.URL(_url)
+                    cursor = self._predictable_next(_url)
+                    if cursor is not None:
+                        # offset cursors let us precompute page urls and fan out
+                        yield res, response.content
+                        async for payload in self._fan_out_pages(cursor, i):
+                            yield payload
+                        return
+                    # opaque cursor, prefetch the next page before handing rows back
+                    pending = asyncio.create_task(self._get_page(_url))
+                yield res, response.content
+        finally:
+            if pending is not None:
+                pending.cancel()
+
+    async def _fan_out_pages(
+        self,
+        cursor: tuple[httpx.URL, int, int],
+        pages_fetched: int,
+    ) -> AsyncIterator[tuple[dict[str, Any], bytes]]:
+        """
+        Fetch batches of offset-addressed pages concurrently,
+        bounded by the client semaphore
+        """
+        url, start, page_size = cursor
+        while True:
+            batch_size = min(self._max_concurrency, CLIENT_MAX_PAGES - pages_fetched + 1)
+            if batch_size <= 0:
                 raise Exception("Too many pages, try to filter more results out.")
-            try:
-                response = await self.client.get(
-                    _url,
-                    params=params | kwargs if not results else None,
-                )
-                response.raise_for_status()
-            except httpx.HTTPStatusError as e:
-                if e.response.status_code == 401:
-                    raise Exception("Authentication failed. Please check your access token or client credentials.")
-                elif e.response.status_code == 403:
-                    raise Exception("Access forbidden. Please ensure your token has the required scopes for this operation.")
-                else:
-                    raise
-            
-            res = response.json()
-            results.extend(res["data"])
-
-            _url = res["page"]["next"]
-            i += 1
-        return results
+            batch = [
+                url.copy_set_param("start", str(start + k * page_size))
+                for k in range(batch_size)
+            ]
+            responses = await asyncio.gather(*(self._get_page(u) for u in batch))
+            pages_fetched += len(responses)
+            for response in responses:
+                self._raise_for_status(response)
+                res = orjson.loads(response.content)
+                if res["data"]:
+                    yield res, response.content
+                if res["page"]["next"] is None or len(res["data"]) < page_size:
+                    return
+            start += batch_size * page_size
+
+    async def paginate_list_endpoint(
+        self,
+        path: str,
+        params: dict[str, Any],
+        **kwargs: Any,
+    ) -> RawPages:
+        """
+        GET all pages of a list endpoint, keeping the page bodies as raw
+        bytes so they are only decoded again once the data is processed
+        """
+        raw = RawPages()
+        async for res, content in self._stream_page_payloads(path, params, **kwargs):
+            rows = res["data"]
+            if raw.first_row is None and rows:
+                raw.first_row = rows[0]
+            raw.row_count += len(rows)
+            raw.pages.append(content)
+        return raw
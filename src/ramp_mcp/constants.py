@@ -1,4 +1,5 @@
 CLIENT_MAX_PAGES = 100
+CLIENT_MAX_RETRIES = 5
 AMOUNT_DESCRIPTION = (
     "The amount is an integer in smallest denomination to avoid precision loss.\n"
     "- So 1000 refers to 1000 cents or $10.00\n"
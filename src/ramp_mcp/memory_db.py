@@ -1,10 +1,87 @@
+import asyncio
 import datetime
-import json
 import sqlite3
+import threading
 import uuid
+from concurrent.futures import ProcessPoolExecutor
 from typing import Any
 
-from flatten_json import flatten
+import orjson
+
+from .types import RawPages
+
+DEFAULT_MAX_MEMORY_BYTES = 256 * 1024 * 1024
+
+
+def _iter_rows(data: RawPages | list[dict[str, Any]]):
+    if isinstance(data, RawPages):
+        # decode each raw page exactly once, straight into the flatten pass
+        for page in data.pages:
+            yield from orjson.loads(page)["data"]
+    else:
+        yield from data
+
+
+def _flatten_and_infer(
+    data: RawPages | list[dict[str, Any]],
+    select_keys: list[str],
+) -> tuple[list[dict[str, Any]], dict[str, str]]:
+    """
+    Reduces and flattens data to only include select keys,
+    writing flat rows directly and inferring column types
+    in the same single pass.
+    Top-level so it pickles into the process pool
+    """
+    keys_split = [(key, key.split("__")) for key in select_keys]
+    processed_data = []
+    # TEXT is the top of the type lattice, columns promoted to it
+    # are settled and skip further inference
+    column_types: dict[str, str] = {}
+    settled: set[str] = set()
+
+    def record_type(col: str, value: Any) -> None:
+        if col in settled:
+            return
+        if isinstance(value, (str, list)):
+            column_types[col] = "TEXT"
+            settled.add(col)
+        elif isinstance(value, float):
+            column_types[col] = "REAL"
+        elif col not in column_types:
+            column_types[col] = "INTEGER"
+
+    for item in _iter_rows(data):
+        row: dict[str, Any] = {}
+        for key, parts in keys_split:
+            value = item
+            for part in parts:
+                if not isinstance(value, dict):
+                    value = None
+                    break
+                value = value.get(part)
+                if isinstance(value, list):
+                    # lists stay as-is here, load_data serializes
+                    # them to JSON text when binding into sqlite
+                    break
+                if value is None:
+                    break
+            if isinstance(value, dict):
+                # key selected a nested object, flatten its leaves under it
+                stack = [(key, value)]
+                while stack:
+                    prefix, sub_dict = stack.pop()
+                    for sub_key, sub_value in sub_dict.items():
+                        path = f"{prefix}__{sub_key}"
+                        if isinstance(sub_value, dict):
+                            stack.append((path, sub_value))
+                        elif sub_value is not None:
+                            row[path] = sub_value
+                            record_type(path, sub_value)
+            elif value is not None:
+                row[key] = value
+                record_type(key, value)
+        processed_data.append(row)
+    return processed_data, column_types
 
 
 class MemoryDatabase:
@@ -13,16 +90,52 @@ class MemoryDatabase:
     with simple built-in ETL data pipeline
     """
 
-    def __init__(self):
-        self.conn = sqlite3.connect(":memory:")
+    def __init__(self, max_memory_bytes: int = DEFAULT_MAX_MEMORY_BYTES):
+        self.max_memory_bytes = max_memory_bytes
+        # named shared-cache in-memory db: per-table writer connections and
+        # the coordinator connection below all see the same tables
+        self._db_uri = f"file:ramp_mcp_{uuid.uuid4().hex}?mode=memory&cache=shared"
+        self.conn = self._open_connection()
         self.conn.row_factory = sqlite3.Row
-        self._cursor = self.conn.cursor()
 
-        self._table_name_to_temp_data: dict[str, list[dict[str, Any]]] = dict()
-        self._table_name_to_cols: dict[str, list[str]] = dict()
+        # CREATE TABLE takes a sqlite_master write lock until the build's
+        # transaction commits, and shared-cache returns SQLITE_LOCKED to
+        # other writers instead of waiting, so overlapping builds must be
+        # serialized here rather than left to sqlite. re-entrant because
+        # commit() evicts under the same lock
+        self._build_lock = threading.RLock()
+
+        # workers fork lazily on first submit
+        self._executor = ProcessPoolExecutor(max_workers=2)
+
+        self._conns: dict[str, sqlite3.Connection] = dict()
+        self._table_name_to_temp_data: dict[
+            str, RawPages | list[dict[str, Any]]
+        ] = dict()
+        self._table_name_to_cols: dict[str, tuple[str, ...]] = dict()
+        self._table_name_to_insert_sql: dict[str, str] = dict()
         self._table_last_access: dict[str, datetime.datetime] = dict()
 
-    def store_data(self, func_name: str, data: list[dict[str, Any]]) -> str:
+    def _open_connection(self) -> sqlite3.Connection:
+        # autocommit mode; create+load run in one explicit transaction.
+        # check_same_thread off so builds can run via asyncio.to_thread
+        conn = sqlite3.connect(
+            self._db_uri,
+            uri=True,
+            isolation_level=None,
+            check_same_thread=False,
+        )
+        # db is ephemeral and in-memory, skip all durability machinery
+        conn.executescript(
+            "PRAGMA synchronous=OFF;"
+            "PRAGMA journal_mode=MEMORY;"
+            "PRAGMA temp_store=MEMORY;"
+        )
+        return conn
+
+    def store_data(
+        self, func_name: str, data: RawPages | list[dict[str, Any]]
+    ) -> str:
         """
         Store response data for processing
         """
@@ -42,14 +155,83 @@ class MemoryDatabase:
         """
         return table_name in self._table_last_access
 
+    async def build_table(self, table_name: str, cols: list[str]) -> None:
+        """
+        Process, create, load, and commit a table.
+        The CPU-bound flatten+infer pass runs in the process pool so
+        it never holds the GIL on the event loop, and the sqlite work
+        runs in a worker thread
+        """
+        loop = asyncio.get_running_loop()
+        processed_data, column_types = await loop.run_in_executor(
+            self._executor,
+            _flatten_and_infer,
+            self._table_name_to_temp_data[table_name],
+            cols,
+        )
+
+        def _create_and_load() -> None:
+            with self._build_lock:
+                self._create_table_from_processed(
+                    table_name, processed_data, column_types
+                )
+                self.load_data(table_name)
+                self.commit(table_name)
+
+        await asyncio.to_thread(_create_and_load)
+
     def commit(self, table_name: str) -> None:
         """
         Commit the current transaction
         """
-        self.conn.commit()
+        conn = self._conns.pop(table_name, None)
+        if conn is not None:
+            conn.commit()
+            conn.close()
         self._table_last_access[table_name] = datetime.datetime.now()
         if table_name in self._table_name_to_temp_data:
             del self._table_name_to_temp_data[table_name]
+        self._evict_lru_tables(keep_table_name=table_name)
+
+    def _db_size_bytes(self) -> int:
+        page_size = self.conn.execute("PRAGMA page_size").fetchone()[0]
+        page_count = self.conn.execute("PRAGMA page_count").fetchone()[0]
+        freelist_count = self.conn.execute("PRAGMA freelist_count").fetchone()[0]
+        return (page_count - freelist_count) * page_size
+
+    def _evict_lru_tables(self, keep_table_name: str) -> None:
+        """
+        Drop least recently used tables once the db crosses the memory
+        watermark, so long sessions that never call clear_table don't
+        grow unboundedly.
+        Best-effort: runs under the build lock so DROP/VACUUM never
+        collide with an in-flight build, and a locked db defers
+        eviction to the next commit instead of failing this one
+        """
+        try:
+            with self._build_lock:
+                if self._db_size_bytes() <= self.max_memory_bytes:
+                    return
+
+                evicted = False
+                by_last_access = sorted(
+                    self._table_last_access, key=self._table_last_access.get
+                )
+                for table_name in by_last_access:
+                    if table_name == keep_table_name:
+                        continue
+                    self.clear_table(table_name)
+                    evicted = True
+                    if self._db_size_bytes() <= self.max_memory_bytes:
+                        break
+                if evicted:
+                    # return the freed pages to the allocator
+                    self.conn.execute("VACUUM")
+        except sqlite3.OperationalError:
+            # another writer still holds the schema lock; the table this
+            # commit built is already durable, so don't turn a full db
+            # into a failed build
+            return
 
     def create_table_with_cols(
         self,
@@ -59,15 +241,30 @@ class MemoryDatabase:
         """
         Create a table from a list of columns
         """
-        processed_data = self._process_data(
+        processed_data, column_types = self._process_data(
             self._table_name_to_temp_data[table_name], cols
         )
+        self._create_table_from_processed(table_name, processed_data, column_types)
+
+    def _create_table_from_processed(
+        self,
+        table_name: str,
+        processed_data: list[dict[str, Any]],
+        column_types: dict[str, str],
+    ) -> None:
         self._table_name_to_temp_data[table_name] = processed_data
 
-        unique_cols = {key for data in processed_data for key in data.keys()}
-        self._table_name_to_cols[table_name] = list(unique_cols)
+        # the flatten pass already saw every emitted column, in
+        # first-seen order, so no extra pass over the rows is needed
+        unique_cols = tuple(column_types)
+        self._table_name_to_cols[table_name] = unique_cols
 
-        column_types = self._infer_column_types(unique_cols, processed_data)
+        # the schema is fixed from here on, prepare the insert statement once
+        placeholders = ", ".join(["?" for _ in unique_cols])
+        columns_str = ", ".join(unique_cols)
+        self._table_name_to_insert_sql[table_name] = (
+            f"INSERT INTO {table_name} ({columns_str}) VALUES ({placeholders})"
+        )
 
         columns = []
         for key, col_type in column_types.items():
@@ -76,7 +273,14 @@ class MemoryDatabase:
         create_table_sql = (
             f'CREATE TABLE IF NOT EXISTS "{table_name}" ({", ".join(columns)})'
         )
-        self._cursor.execute(create_table_sql)
+        conn = self._conns.get(table_name)
+        if conn is None:
+            conn = self._conns[table_name] = self._open_connection()
+        if conn.in_transaction:
+            # a previous create/load failed mid-transaction, discard it
+            conn.rollback()
+        conn.execute("BEGIN")
+        conn.execute(create_table_sql)
 
     def load_data(self, table_name: str) -> None:
         """
@@ -87,21 +291,35 @@ class MemoryDatabase:
             return
 
         unique_cols = self._table_name_to_cols[table_name]
-        placeholders = ", ".join(["?" for _ in unique_cols])
-        columns_str = ", ".join(unique_cols)
 
-        insert_sql = f"INSERT INTO {table_name} ({columns_str}) VALUES ({placeholders})"
+        # one reusable row buffer: sqlite3 copies the bindings into its
+        # own memory before the generator resumes, so yielding the same
+        # list every row is safe and skips a tuple allocation per row
+        buf: list[Any] = [None] * len(unique_cols)
 
-        values = [tuple(item.get(col, None) for col in unique_cols) for item in data]
-        self._cursor.executemany(insert_sql, values)
+        def rows():
+            for item in data:
+                for i, col in enumerate(unique_cols):
+                    value = item.get(col)
+                    if isinstance(value, list):
+                        # lists were left raw by the flatten pass
+                        value = orjson.dumps(value).decode()
+                    buf[i] = value
+                yield buf
+
+        self._conns[table_name].executemany(
+            self._table_name_to_insert_sql[table_name], rows()
+        )
 
     def execute_query(self, query: str) -> list[dict[str, Any]]:
         """
         Execute a SQL query and return results as a list of dicts
         """
         try:
-            self._cursor.execute(query)
-            rows = self._cursor.fetchall()
+            # fresh cursor per call: commits and evictions run on worker
+            # threads, a shared cursor could lose this result set between
+            # execute and fetchall
+            rows = self.conn.execute(query).fetchall()
             return [dict(row) for row in rows]
         except sqlite3.Error as e:
             raise Exception(f"SQL error: {e}")
@@ -110,80 +328,29 @@ class MemoryDatabase:
         """
         Clear a table
         """
-        self._cursor.execute(f"DROP TABLE IF EXISTS {table_name}")
+        conn = self._conns.pop(table_name, None)
+        if conn is not None:
+            # a build was still in flight for this table, discard it
+            if conn.in_transaction:
+                conn.rollback()
+            conn.close()
+        self.conn.execute(f"DROP TABLE IF EXISTS {table_name}")
         if table_name in self._table_name_to_temp_data:
             del self._table_name_to_temp_data[table_name]
         if table_name in self._table_name_to_cols:
             del self._table_name_to_cols[table_name]
+        if table_name in self._table_name_to_insert_sql:
+            del self._table_name_to_insert_sql[table_name]
         if table_name in self._table_last_access:
             del self._table_last_access[table_name]
         self.conn.commit()
 
-    def _infer_column_types(
-        self, cols: list[str], data: list[dict[str, Any]]
-    ) -> dict[str, str]:
-        """
-        Infer column types from data
-        """
-        column_types = {col: "INTEGER" for col in cols}
-        for data in data:
-            for key, value in data.items():
-                if isinstance(value, str) or value is None:
-                    column_types[key] = "TEXT"
-                elif isinstance(value, float):
-                    column_types[key] = "REAL"
-
-        return column_types
-
-    def _get_value_from_key(
-        self,
-        data: dict[str, Any],
-        key: str,
-    ) -> Any:
-        """
-        Get a value from a potentially nested key
-        """
-        keys = key.split("__")
-        result = data
-        for key in keys:
-            result = result.get(key)
-            if isinstance(result, list):
-                # just turn lists into strings
-                return json.dumps(result)
-            if result is None:
-                return None
-        return result
-
-    def _get_subset_from_keys(
-        self,
-        data: dict[str, Any],
-        keys: list[str],
-    ) -> dict[str, Any]:
-        """
-        Create a subset of the dict using the given keys,
-        including nested keys
-        """
-        result = {}
-        for key in keys:
-            value = self._get_value_from_key(data, key)
-            if value is not None:
-                keys_split = key.split("__")
-                current = result
-                for sub_key in keys_split[:-1]:
-                    if sub_key not in current:
-                        current[sub_key] = {}
-                    current = current[sub_key]
-                current[keys_split[-1]] = value
-
-        return result
-
     def _process_data(
         self,
-        data: list[dict[str, Any]],
+        data: RawPages | list[dict[str, Any]],
         select_keys: list[str],
-    ) -> list[dict[str, Any]]:
+    ) -> tuple[list[dict[str, Any]], dict[str, str]]:
         """
         Reduces and flattens data to only include select keys
         """
-        reduced_data = [self._get_subset_from_keys(item, select_keys) for item in data]
-        return [flatten(item, separator="__") for item in reduced_data]
+        return _flatten_and_infer(data, select_keys)
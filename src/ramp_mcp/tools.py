@@ -1,3 +1,4 @@
+import asyncio
 from functools import wraps
 from typing import Any, Literal
 
@@ -9,12 +10,29 @@ from .constants import (
     SK_CATEGORIES,
 )
 from .memory_db import MemoryDatabase
-from .types import Role
+from .types import RawPages, Role
 from .utils import get_nested_keys, str_date_to_datetime
 
 ramp_client = RampAsyncClient()
 memory_db = MemoryDatabase()
 
+# both lists are static, build them once at import
+_RAMP_CATEGORIES_CACHE = tuple(
+    {"id": k, "name": v} for k, v in SK_CATEGORIES.items()
+)
+_CURRENCIES_CACHE = tuple(
+    {"currency_code": val.code, "currency_name": val.currency_name}
+    for val in Currency
+)
+
+
+# built once, not per error
+_ERR_FMT = (
+    "Ran into an error: %s\n"
+    "Communicate this to the user and consider retrying "
+    "if the error seems transient.\n"
+)
+
 
 def handle_response(func):
     """
@@ -25,12 +43,11 @@ def handle_response(func):
     async def wrapper(*args, **kwargs) -> str | list[dict[str, Any]]:
         try:
             return await func(*args, **kwargs)
+        except asyncio.CancelledError:
+            # never swallow cancellation into an error string
+            raise
         except Exception as e:
-            return (
-                f"Ran into an error: {e}\n"
-                "Communicate this to the user and consider retrying "
-                "if the error seems transient.\n"
-            )
+            return _ERR_FMT % e
 
     return wrapper
 
@@ -52,7 +69,7 @@ def handle_load_response(func):
             f"Stored data in memory database with table name: {name}.\n "
             f"Call `process_data` tool with table name and desired columns to setup a SQL table.\n "
             f"Call `execute_query` tool with query to get results as a JSON.\n "
-            f"Available columns are: {', '.join(get_nested_keys(data[0]))}\n"
+            f"Available columns are: {', '.join(get_nested_keys(data.first_row))}\n"
             f"Call `clear_table` tool with table name to delete the table from the memory database.\n"
         )
 
@@ -78,9 +95,9 @@ async def process_data(table_name: str, cols: list[str]) -> str:
     """
     if memory_db.data_is_processed(table_name):
         return f"Table {table_name} already processed"
-    memory_db.create_table_with_cols(table_name, cols)
-    memory_db.load_data(table_name)
-    memory_db.commit(table_name)
+    # the build runs off the event loop so the flatten+insert work
+    # doesn't block other tool calls or in-flight pagination
+    await memory_db.build_table(table_name, cols)
     return f"Table {table_name} created"
 
 
@@ -104,7 +121,7 @@ async def get_ramp_categories() -> list[dict[str, Any]]:
     """
     Get Ramp transaction categories
     """
-    return [{"id": k, "name": v} for k, v in SK_CATEGORIES.items()]
+    return list(_RAMP_CATEGORIES_CACHE)
 
 
 @handle_response
@@ -112,10 +129,7 @@ async def get_currencies() -> list[dict[str, Any]]:
     """
     Get currencies
     """
-    return [
-        {"currency_code": val.code, "currency_name": val.currency_name}
-        for val in Currency
-    ]
+    return list(_CURRENCIES_CACHE)
 
 
 # ================================================
@@ -129,7 +143,7 @@ async def load_transactions(
     card_id: str | None = None,
     ramp_category_ids: list[str] = [],
     accounting_sync_ready: bool | None = None,
-) -> list[dict[str, Any]]:
+) -> RawPages:
     f"""
     Transactions are sorted by amount in descending order and only represent card transactions.
     {AMOUNT_DESCRIPTION}
@@ -158,7 +172,7 @@ async def load_transactions(
 async def load_spend_export(
     from_date: str,
     to_date: str,
-) -> list[dict[str, Any]]:
+) -> RawPages:
     """
     Spend export is a list of all spend events (transactions, reimbursements, bills etc.) for a user.
     Always use this over load_transactions, load_reimbursements, load_bills, etc. when possible
@@ -185,7 +199,7 @@ async def load_receipts(
     transaction_id: str | None = None,
     created_before: str | None = None,
     created_after: str | None = None,
-) -> list[dict[str, Any]]:
+) -> RawPages:
     f"""
     Get receipts
     {AMOUNT_DESCRIPTION}
@@ -215,7 +229,7 @@ async def load_reimbursements(
     sync_ready: bool | None = None,
     direction: Literal["BUSINESS_TO_USER", "USER_TO_BUSINESS", ""] = "",
     user_id: str | None = None,
-) -> list[dict[str, Any]]:
+) -> RawPages:
     f"""
     Get reimbursements for user
     {AMOUNT_DESCRIPTION}
@@ -244,7 +258,7 @@ async def load_bills(
     payment_status: Literal["OPEN", "PAID", ""] = "",
     user_id: str | None = None,
     acccounting_sync_ready: bool | None = None,
-) -> list[dict[str, Any]]:
+) -> RawPages:
     f"""
     Get bills for user
     {AMOUNT_DESCRIPTION}
@@ -269,7 +283,7 @@ async def load_bills(
 @handle_load_response
 async def load_locations(
     entity_id: str | None = None,
-) -> list[dict[str, Any]]:
+) -> RawPages:
     """
     Get locations for entity
     """
@@ -284,7 +298,7 @@ async def load_locations(
 
 
 @handle_load_response
-async def load_departments() -> list[dict[str, Any]]:
+async def load_departments() -> RawPages:
     """
     Get departments
     """
@@ -297,7 +311,7 @@ async def load_departments() -> list[dict[str, Any]]:
 @handle_load_response
 async def load_bank_accounts(
     bank_account_id: str,
-) -> list[dict[str, Any]]:
+) -> RawPages:
     """
     Get bank accounts for own business/entities.
     """
@@ -318,7 +332,7 @@ async def load_vendors(
     name: str | None = None,
     from_created_at: str | None = None,
     to_created_at: str | None = None,
-) -> list[dict[str, Any]]:
+) -> RawPages:
     """
     Get vendors for user
 
@@ -345,7 +359,7 @@ async def load_vendors(
 @handle_load_response
 async def load_vendor_bank_accounts(
     vendor_id: str,
-) -> list[dict[str, Any]]:
+) -> RawPages:
     """
     Get bank accounts for vendors
     """
@@ -360,7 +374,7 @@ async def load_vendor_bank_accounts(
 @handle_load_response
 async def load_entities(
     entity_name: str | None = None,
-) -> list[dict[str, Any]]:
+) -> RawPages:
     """
     Get entities for user
     """
@@ -377,7 +391,7 @@ async def load_entities(
 @handle_load_response
 async def load_spend_limits(
     user_id: str | None = None,
-) -> list[dict[str, Any]]:
+) -> RawPages:
     """
     Get limits for user
     """
@@ -392,7 +406,7 @@ async def load_spend_limits(
 
 
 @handle_load_response
-async def load_spend_programs() -> list[dict[str, Any]]:
+async def load_spend_programs() -> RawPages:
     """
     Get spend programs
     """
@@ -406,7 +420,7 @@ async def load_spend_programs() -> list[dict[str, Any]]:
 async def load_users(
     email: str | None = None,
     role: Role = "",
-) -> list[dict[str, Any]]:
+) -> RawPages:
     """
     Get users from Ramp
     """
@@ -1,4 +1,26 @@
-from typing import Literal, TypeAlias
+from typing import Any, Literal, TypeAlias
+
+
+class RawPages:
+    """
+    Pages of a list endpoint kept as raw response bytes.
+    The bytes blob is much smaller than the decoded dict tree, so this
+    is what sits in memory between store_data and process_data; the
+    pages are decoded exactly once, into the flatten pass
+    """
+
+    __slots__ = ("pages", "first_row", "row_count")
+
+    def __init__(self) -> None:
+        self.pages: list[bytes] = []
+        self.first_row: dict[str, Any] | None = None
+        self.row_count: int = 0
+
+    def __bool__(self) -> bool:
+        return self.row_count > 0
+
+    def __len__(self) -> int:
+        return self.row_count
 
 # these should be enums
 # claude likes to pass in empty strings to mean null